@@ -1,5 +1,5 @@
 from langchain_core.messages import SystemMessage, HumanMessage
-from agents.base import BaseAgent
+from agents.base import BaseAgent, lazy_singleton
 from utils import all_tool_functions
 
 class ArchitectAgent(BaseAgent):
@@ -28,7 +28,9 @@ Tools MUST:
             ]
         })
 
+# Shared agent instance, created on first use
+_get_architect = lazy_singleton(ArchitectAgent)
+
 def architect(task: str) -> str:
     """Creates new tools for agents to use."""
-    agent = ArchitectAgent()
-    return agent.process(task)
\ No newline at end of file
+    return _get_architect().process(task)
\ No newline at end of file
@@ -1,18 +1,86 @@
 # agents/base.py
-from typing import List, Any, Dict, TypedDict, Union, Literal
+from typing import List, Any, Dict, TypedDict, Union, Literal, Tuple, Coroutine, TypeVar, Annotated, Iterator, Callable
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import logging
+import operator
+import threading
 
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, AIMessageChunk, ToolMessage
 from langchain_core.utils.function_calling import convert_to_openai_function
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, END
+from langgraph.graph.message import add_messages
+
+from utils import WORKER_POOL, DELEGATION_POOL, run_concurrently
+
+logger = logging.getLogger(__name__)
 
 class AgentState(TypedDict):
-    """Type definition for agent state."""
-    messages: List[Any]
+    """Type definition for agent state.
+
+    Nodes return only new messages; the add_messages reducer appends them.
+    """
+    messages: Annotated[List[Any], add_messages]
     iterations: int
     final_answer: str | None
+    # Plain-text conversation contents, appended as messages are added
+    history_texts: Annotated[List[str], operator.add]
+
+# LLM client, prompt and tool schemas shared by every agent instance with the
+# same configuration, so they are only built once per process. Graphs are
+# compiled per instance because their nodes are bound to that instance.
+_SHARED: Dict[Tuple[Any, ...], Tuple[Any, ...]] = {}
+_SHARED_LOCK = threading.Lock()
+
+# Tools that run another agent; their calls go to the delegation pool
+_DELEGATION_TOOLS = frozenset({"assign_agent_to_task"})
+
+# OpenAI function schemas by tool identity; tools are module-level singletons
+_SCHEMA_CACHE: Dict[int, Dict[str, Any]] = {}
+
+def _to_schema(tool: Any) -> Dict[str, Any]:
+    """Convert a tool to its OpenAI function schema, converting each tool once."""
+    schema = _SCHEMA_CACHE.get(id(tool))
+    if schema is None:
+        schema = convert_to_openai_function(tool)
+        _SCHEMA_CACHE[id(tool)] = schema
+    return schema
+
+T = TypeVar("T")
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine to completion from synchronous agent code.
+
+    If an event loop is already running in this thread (e.g. inside an async
+    FastAPI handler), the coroutine is run on a separate thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+def lazy_singleton(factory: Callable[[], T]) -> Callable[[], T]:
+    """Return a getter that builds one shared instance on first call.
+
+    Agents are expensive to construct, so each agent module exposes its
+    instance through a getter made by this helper.
+    """
+    instance: List[T] = []
+    lock = threading.Lock()
+
+    def get() -> T:
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+
+    return get
 
 class BaseAgent(ABC):
     """Base class for all agents in the system."""
@@ -22,15 +90,39 @@ class BaseAgent(ABC):
         self.system_prompt = system_prompt
         self.tools = tools if tools is not None else []
         self.max_iterations = max_iterations
-        self.llm = ChatOpenAI(
-            model="gpt-4-turbo-preview",
-            temperature=0,
-            timeout=30  # 30 second timeout
-        )
-        self.prompt = self._create_prompt()
-        self.tool_schemas = [convert_to_openai_function(t) for t in self.tools]
+        self.llm, self.prompt, self.tool_schemas = self._shared()
         self.graph = self._build_graph()
 
+    def _shared_key(self) -> Tuple[Any, ...]:
+        """Key identifying agents that can share the same LLM client, prompt and tool schemas."""
+        return (
+            type(self),
+            self.name,
+            self.system_prompt,
+            tuple(id(t) for t in self.tools)
+        )
+
+    def _shared(self) -> Tuple[Any, ...]:
+        """Return the (llm, prompt, tool_schemas) tuple, building it on first use."""
+        key = self._shared_key()
+        shared = _SHARED.get(key)
+        if shared is None:
+            with _SHARED_LOCK:
+                shared = _SHARED.get(key)
+                if shared is None:
+                    self.llm = ChatOpenAI(
+                        model="gpt-4-turbo-preview",
+                        temperature=0,
+                        timeout=30,  # 30 second timeout
+                        # Per-agent key so requests sharing a prompt prefix hit the provider cache
+                        model_kwargs={"prompt_cache_key": f"almaze-{self.name}-v1"}
+                    )
+                    self.prompt = self._create_prompt()
+                    self.tool_schemas = [_to_schema(t) for t in self.tools]
+                    shared = (self.llm, self.prompt, self.tool_schemas)
+                    _SHARED[key] = shared
+        return shared
+
     def _create_prompt(self) -> ChatPromptTemplate:
         """Create the prompt template."""
         return ChatPromptTemplate.from_messages([
@@ -81,14 +173,13 @@ Instructions:
         iterations = state.get('iterations', 0)
         final_answer = state.get('final_answer')
         
-        print(f"\n{self.name} is thinking... (iteration {iterations + 1}/{self.max_iterations})")
+        logger.info("%s is thinking... (iteration %d/%d)", self.name, iterations + 1, self.max_iterations)
         
         try:
             # If we've reached max iterations, generate final answer
             if iterations >= self.max_iterations:
-                final_response = self._generate_final_answer(messages)
+                final_response = self._generate_final_answer(state.get('history_texts', []))
                 return {
-                    "messages": messages,
                     "iterations": iterations + 1,
                     "final_answer": final_response
                 }
@@ -96,67 +187,103 @@ Instructions:
             # Get the last message
             last_message = messages[-1] if messages else None
             if not last_message:
-                return state
+                return {"iterations": iterations + 1}
             
-            # Get chat history
-            chat_history = messages[:-1] if len(messages) > 1 else []
+            # The latest user turn fills the prompt; any tool calls and results
+            # made since then follow it, so each result stays linked to its call
+            human_index = next(
+                (i for i in range(len(messages) - 1, -1, -1) if isinstance(messages[i], HumanMessage)),
+                len(messages) - 1
+            )
+            human_message = messages[human_index]
             
-            # Get model response
-            response = self.llm.invoke(
+            # Get model response, streamed so tokens reach process_events as they arrive
+            response = self._stream_llm(
                 self.prompt.format_messages(
-                    input=last_message.content if hasattr(last_message, 'content') else str(last_message),
-                    chat_history=chat_history
-                ),
-                functions=self.tool_schemas if self.tools else None
+                    input=human_message.content if hasattr(human_message, 'content') else str(human_message),
+                    chat_history=messages[:human_index]
+                ) + messages[human_index + 1:],
+                **({"tools": self._tool_specs()} if self.tools else {})
             )
             
-            # If response has function call, execute tool
-            if hasattr(response, 'function_call') and response.function_call:
-                tool_result = self._execute_tool(response.function_call)
-                new_messages = messages + [
-                    AIMessage(content="", function_call=response.function_call),
-                    SystemMessage(content=str(tool_result))
+            # If response has tool calls, execute them all and record results in call order
+            if response.tool_calls:
+                tool_results = self._execute_tools(response.tool_calls)
+                new_messages = [AIMessage(content=response.content, tool_calls=response.tool_calls)]
+                new_messages += [
+                    ToolMessage(content=str(tool_result), tool_call_id=tool_call['id'])
+                    for tool_call, tool_result in zip(response.tool_calls, tool_results)
                 ]
+                new_texts = [str(tool_result) for tool_result in tool_results]
             else:
-                new_messages = messages + [AIMessage(content=response.content)]
+                new_messages = [AIMessage(content=response.content)]
+                new_texts = [response.content]
                 final_answer = response.content
             
             return {
                 "messages": new_messages,
                 "iterations": iterations + 1,
-                "final_answer": final_answer
+                "final_answer": final_answer,
+                "history_texts": new_texts
             }
             
         except Exception as e:
-            print(f"Error in processing: {str(e)}")
+            logger.error("Error in processing: %s", e, exc_info=True)
             error_msg = f"Error occurred: {str(e)}"
             return {
-                "messages": messages + [SystemMessage(content=error_msg)],
+                "messages": [SystemMessage(content=error_msg)],
                 "iterations": iterations + 1,
                 "final_answer": error_msg
             }
 
-    def _execute_tool(self, function_call: Any) -> str:
+    def _stream_llm(self, messages: Any, **kwargs: Any) -> AIMessageChunk:
+        """Stream an LLM response and return the aggregated message."""
+        response = None
+        for chunk in self.llm.stream(messages, **kwargs):
+            response = chunk if response is None else response + chunk
+        return response if response is not None else AIMessageChunk(content="")
+
+    def _tool_specs(self) -> List[Dict[str, Any]]:
+        """Wrap the tool schemas in the OpenAI tools format."""
+        return [{"type": "function", "function": schema} for schema in self.tool_schemas]
+
+    def _execute_tool(self, tool_call: Dict[str, Any]) -> str:
         """Execute a tool call."""
         try:
-            tool = next((t for t in self.tools if t.name == function_call.name), None)
+            tool = next((t for t in self.tools if t.name == tool_call['name']), None)
             if tool:
-                return tool.invoke(function_call.arguments)
-            return f"Tool {function_call.name} not found"
+                return tool.invoke(tool_call['args'])
+            return f"Tool {tool_call['name']} not found"
         except Exception as e:
             return f"Error executing tool: {str(e)}"
 
-    def _generate_final_answer(self, messages: List[Any]) -> str:
+    def _execute_tools(self, tool_calls: List[Dict[str, Any]]) -> List[str]:
+        """Execute the tool calls from a single model turn.
+
+        Calls within one turn are treated as independent and run in parallel.
+        """
+        if len(tool_calls) == 1:
+            return [self._execute_tool(tool_calls[0])]
+        return run_concurrently([
+            (DELEGATION_POOL if tool_call['name'] in _DELEGATION_TOOLS else WORKER_POOL,
+             self._execute_tool, tool_call)
+            for tool_call in tool_calls
+        ])
+
+    def _generate_final_answer(self, history_texts: List[str]) -> str:
         """Generate a final answer from the conversation history."""
         try:
             # Create a prompt to summarize the conversation
+            history = "\n".join(history_texts)
             summary_prompt = f"""Based on the conversation history, provide a clear final answer.
             If no clear answer was reached, provide the best possible response based on available information.
             
-            History: {[m.content for m in messages if hasattr(m, 'content')]}"""
+            History:
+{history}"""
             
             response = self.llm.invoke(summary_prompt)
             return response.content
+        except Exception as e:
             return f"Failed to generate final answer: {str(e)}"
 
     def _should_continue(self, state: AgentState) -> Literal["continue", END]:
@@ -168,28 +295,64 @@ Instructions:
             return END
         return "continue"
 
-    def process(self, input_text: str) -> str:
-        """Process input and return response."""
-        initial_state = {
+    def _initial_state(self, input_text: str) -> AgentState:
+        """Build the initial graph state for a request."""
+        return {
             "messages": [
                 SystemMessage(content=self.system_prompt),
                 HumanMessage(content=input_text)
             ],
             "iterations": 0,
-            "final_answer": None
+            "final_answer": None,
+            "history_texts": [input_text]
         }
-        
-        try:
-            final_state = self.graph.invoke(initial_state)
-            
-            if final_state.get('final_answer'):
-                return final_state['final_answer']
-            
-            if final_state and "messages" in final_state:
-                messages = final_state["messages"]
-                return messages[-1].content if messages else "No response generated"
-            
+
+    def _final_response(self, final_state: Dict[str, Any] | None) -> str:
+        """Extract the response text from the final graph state."""
+        if not final_state:
             return "No response generated"
+
+        if final_state.get('final_answer'):
+            return final_state['final_answer']
+
+        if "messages" in final_state:
+            messages = final_state["messages"]
+            return messages[-1].content if messages else "No response generated"
+
+        return "No response generated"
+
+    def process(self, input_text: str) -> str:
+        """Process input and return response."""
+        try:
+            final_state = self.graph.invoke(self._initial_state(input_text))
+            return self._final_response(final_state)
         except Exception as e:
-            print(f"Processing error: {str(e)}")
-            return f"Error processing request: {str(e)}"
\ No newline at end of file
+            logger.error("Processing error: %s", e, exc_info=True)
+            return f"Error processing request: {str(e)}"
+
+    def process_events(self, input_text: str) -> Iterator[Tuple[str, str]]:
+        """Process input, yielding ("delta", text) events as the LLM generates.
+
+        The last event is always ("final", response), where response is what
+        process() would return. Deltas may include text that is not part of
+        it, such as a routing preamble before a tool call.
+        """
+        final_state = None
+        try:
+            for mode, data in self.graph.stream(
+                self._initial_state(input_text),
+                stream_mode=["messages", "values"]
+            ):
+                if mode == "values":
+                    final_state = data
+                    continue
+
+                chunk, _metadata = data
+                if isinstance(chunk, AIMessageChunk) and chunk.content:
+                    yield "delta", chunk.content
+        except Exception as e:
+            logger.error("Processing error: %s", e, exc_info=True)
+            yield "final", f"Error processing request: {str(e)}"
+            return
+
+        yield "final", self._final_response(final_state)
@@ -1,12 +1,15 @@
-from typing import List, Any, Dict, Literal
+from typing import List, Any, Dict, Iterator, Literal, Optional, Tuple
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
-from agents.base import BaseAgent, AgentState
+from agents.base import BaseAgent, AgentState, lazy_singleton
 from tools.agent.list_available_agents import list_available_agents
 from tools.agent.assign_agent_to_task import assign_agent_to_task
+from utils import DELEGATION_POOL, json_dumps, run_concurrently
 from langgraph.graph import END
-import json
+import logging
 import re
 
+logger = logging.getLogger(__name__)
+
 AGENT_DESCRIPTIONS = {
     "tool_smith": "Creates new specialized agents for specific tasks",
     "architect": "Creates and manages tools that other agents can use",
@@ -14,19 +17,22 @@ AGENT_DESCRIPTIONS = {
     "techsage": "Handles code-related tasks and software development"
 }
 
+# Agent list formatted once for interpolation into prompts
+_AGENT_DESC_TEXT = "\n".join(f"- {name}: {description}" for name, description in AGENT_DESCRIPTIONS.items())
+_VALID_AGENTS = tuple(AGENT_DESCRIPTIONS)
+_LEADING_RE = re.compile(r'^[\d\s\.]+')
+
 class CompassAgent(BaseAgent):
-    def __init__(self):
-        system_prompt = """You are Compass, the orchestrator agent of ALMAZE.
+    def __init__(self, enable_parallel_delegation: bool = True):
+        self.enable_parallel_delegation = enable_parallel_delegation
+        system_prompt = f"""You are Compass, the orchestrator agent of ALMAZE.
 Your role is to:
 1. Understand the user's request
 2. Determine which agent(s) would be best suited for the task
 3. Coordinate between agents to accomplish the goal
 
 Available specialized agents:
-- tool_smith: Creates new specialized agents for specific tasks
-- architect: Creates and manages tools that other agents can use
-- scout: Performs internet research and gathers information
-- techsage: Handles code-related tasks and software development
+{_AGENT_DESC_TEXT}
 
 Follow these steps:
 1. Analyze the user's request
@@ -38,103 +44,91 @@ Follow these steps:
    - For complex tasks, break them down and coordinate multiple agents"""
         
         super().__init__("compass", system_prompt, [list_available_agents, assign_agent_to_task])
+        self.delegation_tools = [
+            spec for spec in self._tool_specs()
+            if spec['function']['name'] == assign_agent_to_task.name
+        ]
 
     def _clean_agent_name(self, name: str) -> str:
-        cleaned_name = re.sub(r'^[\d\s\.]+', '', name).strip().lower()
+        cleaned_name = _LEADING_RE.sub('', name).strip().lower()
         
         # Ensure the cleaned name matches one of the available agents
-        for valid_agent in AGENT_DESCRIPTIONS.keys():
-            if valid_agent in cleaned_name:
-                return valid_agent
-        
-        return 'direct'
+        return next((valid_agent for valid_agent in _VALID_AGENTS if valid_agent in cleaned_name), 'direct')
 
-    def _analyze_task(self, task: str) -> Dict[str, Any]:
-        """Analyze the task to determine required agents with stricter agent selection."""
-        analysis_prompt = f"""Carefully analyze this task and determine the MOST APPROPRIATE single agent to handle it.
-Do NOT suggest multiple agents unless absolutely necessary.
+    def _parse_tool_calls(self, response: Any) -> Optional[Dict[str, Any]]:
+        """Build the agent assignment from the model's tool calls, if any.
 
-Task: {task}
+        The first assigned agent is the primary one; further assignments in
+        the same turn become additional agents.
+        """
+        agents = []
+        task_breakdown = []
+        for tool_call in response.tool_calls:
+            if tool_call['name'] != assign_agent_to_task.name:
+                continue
+            arguments = tool_call.get('args') or {}
+            agent = self._clean_agent_name(arguments.get('agent_name', ''))
+            if agent == 'direct' or agent in agents:
+                continue
+            agents.append(agent)
+            if arguments.get('task'):
+                task_breakdown.append(arguments['task'])
 
-Available agents:
-{AGENT_DESCRIPTIONS}
+        if not agents:
+            return None
 
-Return your analysis in this format:
-1. Primary agent needed (or 'direct' if compass can handle it)
-2. Precise reason for choosing this agent
-3. Additional agents (ONLY if truly required, otherwise 'None')
-4. Brief task breakdown (if needed)"""
-        
-        response = self.llm.invoke(analysis_prompt)
-        
-        # Analyze the response to ensure a more focused agent selection
-        analysis = self._parse_analysis(response.content)
-        
-        # Additional filtering to prevent unnecessary agent chaining
-        if analysis['primary_agent'] == 'scout':
-            # For web research tasks, prevent automatic additional agents
-            analysis['additional_agents'] = []
-        
-        return analysis
+        # Web research is answered by scout alone; don't chain other agents after it
+        if agents[0] == 'scout':
+            agents = agents[:1]
+            task_breakdown = task_breakdown[:1]
 
-    def _parse_analysis(self, analysis: str) -> Dict[str, Any]:
-        """Parse the analysis response into a structured format."""
-        try:
-            lines = analysis.split('\n')
-            return {
-                'primary_agent': self._clean_agent_name(lines[0].split(':')[1].strip()),
-                'reason': lines[1].split(':')[1].strip() if len(lines) > 1 else '',
-                'additional_agents': [
-                    self._clean_agent_name(a.strip()) 
-                    for a in (lines[2].split(':')[1].split(',') if len(lines) > 2 and ':' in lines[2] 
-                    else lines[2].split(',') if len(lines) > 2 else [])
-                    if a.strip() and a.strip().lower() != 'none'
-                ],
-                'task_breakdown': lines[3:] if len(lines) > 3 else []
-            }
-        except Exception as e:
-            print(f"Error parsing analysis: {str(e)}")
-            return {
-                'primary_agent': 'direct',
-                'reason': 'Error in analysis',
-                'additional_agents': [],
-                'task_breakdown': []
-            }
+        return {
+            'primary_agent': agents[0],
+            'reason': response.content or f"Delegated to {', '.join(agents)}",
+            'additional_agents': agents[1:],
+            'task_breakdown': task_breakdown
+        }
 
     def _process_step(self, state: AgentState) -> AgentState:
         """Process a single step with proper agent coordination."""
-        print(f"\n{self.name} is thinking...")
+        logger.info("%s is thinking...", self.name)
         messages = state.get('messages', [])
         iterations = state.get('iterations', 0)
+        last_message = messages[-1] if messages else None
+        if not last_message:
+            return {"iterations": iterations + 1}
+        task = last_message.content
         
         try:
-            # Get the last message
-            last_message = messages[-1] if messages else None
-            if not last_message:
-                return state
-
             # Prepare response data
             response_data = {
-                "task": last_message.content,
+                "task": task,
                 "analysis": None,
                 "response": None,
                 "agent_responses": [],
                 "error": None
             }
 
-            # Analyze task and coordinate agents
-            analysis = self._analyze_task(last_message.content)
-            response_data["analysis"] = analysis
+            # Let the model either answer directly or assign an agent in a single call
+            chat_history = messages[:-1] if len(messages) > 1 else []
+            llm_response = self._stream_llm(
+                self.prompt.format_messages(
+                    input=task,
+                    chat_history=chat_history
+                ),
+                tools=self.delegation_tools
+            )
+            analysis = self._parse_tool_calls(llm_response)
 
-            if analysis['primary_agent'] == 'direct':
+            if analysis is None:
                 # Direct response from Compass
-                chat_history = messages[:-1] if len(messages) > 1 else []
-                response = self.llm.invoke(
-                    self.prompt.format_messages(
-                        input=last_message.content,
-                        chat_history=chat_history
-                    )
-                ).content
+                response = llm_response.content
+                response_data["analysis"] = {
+                    'primary_agent': 'direct',
+                    'reason': 'Answered directly by compass',
+                    'additional_agents': [],
+                    'task_breakdown': []
+                }
                 response_data["response"] = response
                 response_data["agent_responses"] = [
                     {
@@ -144,28 +138,30 @@ Return your analysis in this format:
                 ]
             else:
                 # Delegate to appropriate agents
-                response_data["agent_responses"] = self._delegate_to_agents(analysis, last_message.content)
+                response_data["analysis"] = analysis
+                if self.enable_parallel_delegation:
+                    response_data["agent_responses"] = self._delegate_to_agents_parallel(analysis, task)
+                else:
+                    response_data["agent_responses"] = self._delegate_to_agents(analysis, task)
                 response = self._format_responses(
                     [resp['response'] for resp in response_data["agent_responses"]], 
                     analysis
                 )
                 response_data["response"] = response
 
-            # Convert response to JSON
-            json_response = json.dumps(response_data)
-
-            # Update state
+            response_json = json_dumps(response_data)
             return {
-                "messages": messages + [AIMessage(content=json_response)],
-                "iterations": iterations + 1
+                "messages": [AIMessage(content=response_json)],
+                "iterations": iterations + 1,
+                "final_answer": response_json
             }
 
         except Exception as e:
             error_msg = f"Error in processing: {str(e)}"
-            print(error_msg)
+            logger.error("Error in processing: %s", e, exc_info=True)
             
             error_response = {
-                "task": last_message.content if last_message else "No task",
+                "task": task,
                 "error": error_msg,
                 "suggestions": [
                     "Try rephrasing your request",
@@ -174,9 +170,11 @@ Return your analysis in this format:
                 ]
             }
             
+            error_json = json_dumps(error_response)
             return {
-                "messages": messages + [SystemMessage(content=json.dumps(error_response))],
-                "iterations": iterations + 1
+                "messages": [SystemMessage(content=error_json)],
+                "iterations": iterations + 1,
+                "final_answer": error_json
             }
 
     def _delegate_to_agents(self, analysis: Dict[str, Any], task: str) -> List[Dict[str, str]]:
@@ -207,6 +205,37 @@ Return your analysis in this format:
                 })
 
         return agent_responses
+
+    def _delegate_to_agents_parallel(self, analysis: Dict[str, Any], task: str) -> List[Dict[str, str]]:
+        """Delegate task to the primary agent, then run additional agents concurrently."""
+        primary_response = assign_agent_to_task.invoke({
+            "agent_name": analysis['primary_agent'],
+            "task": task
+        })
+        agent_responses = [{
+            "agent": analysis['primary_agent'],
+            "response": primary_response
+        }]
+
+        # Additional agents only see the primary response, so they can run in parallel
+        additional_agents = [
+            agent for agent in analysis['additional_agents']
+            if agent != analysis['primary_agent']
+        ]
+        responses = run_concurrently([
+            (DELEGATION_POOL, assign_agent_to_task.invoke, {
+                "agent_name": agent,
+                "task": self._create_subtask(task, agent, agent_responses)
+            })
+            for agent in additional_agents
+        ])
+        agent_responses.extend(
+            {"agent": agent, "response": response}
+            for agent, response in zip(additional_agents, responses)
+        )
+
+        return agent_responses
+
     def _create_subtask(self, original_task: str, agent: str, previous_responses: List[Dict[str, str]]) -> str:
         """Create a subtask for an agent based on context."""
         previous_responses_str = "\n".join([
@@ -248,7 +277,17 @@ Let me know if you need any clarification or have additional questions."""
             
         return "continue"
 
+# Shared agent instance, created on first use
+_get_compass = lazy_singleton(CompassAgent)
+
 def compass(session_id: str, task: str) -> str:
     """The orchestrator that interacts with users and coordinates other agents."""
-    agent = CompassAgent()
-    return agent.process(task)
\ No newline at end of file
+    return _get_compass().process(task)
+
+def compass_events(session_id: str, task: str) -> Iterator[Tuple[str, str]]:
+    """Like compass, but yields ("delta", text) events as text is generated,
+    ending with ("final", response) carrying what compass would return.
+
+    Deltas only cover Compass's own model call; delegated agents run to
+    completion and their output is part of the final response only."""
+    return _get_compass().process_events(task)
\ No newline at end of file
@@ -1,19 +1,41 @@
 from typing import List, Any, Dict, Literal, Optional
+from collections import OrderedDict
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 from langgraph.graph import END
-from agents.base import BaseAgent, AgentState
+from agents.base import BaseAgent, AgentState, lazy_singleton
 from tools.web.duck_duck_go_web_search import duck_duck_go_web_search
-import json
+from utils import json_dumps
+import functools
 import re
 import logging
+import threading
 from datetime import datetime
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Patterns used to clean search snippets and normalize queries
+_HTML_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
+_SPECIAL_RE = re.compile(r'[^\w\s.,!?-]')
+_QUERY_PATTERNS = [
+    (re.compile(r'^what\s+is\s+'), ''),
+    (re.compile(r'^who\s+is\s+'), ''),
+    (re.compile(r'^how\s+does\s+'), ''),
+    (re.compile(r'^why\s+'), '')
+]
+_ENHANCE_TERMS = ' '.join([
+    "definition", "explanation", "overview",
+    "key concepts", "main features", "important aspects"
+])
+
+# Maximum number of research responses kept in ScoutAgent's response cache
+_RESPONSE_CACHE_SIZE = 256
+
 class ScoutAgent(BaseAgent):
-    def __init__(self):
+    def __init__(self, include_key_points: bool = False):
+        self.include_key_points = include_key_points
         system_prompt = """# Scout Agent
 
 ## Role & Objective
@@ -54,59 +76,74 @@ Your responses should be informative, clear, and well-organized, focusing on pro
             tools=[duck_duck_go_web_search],
             max_iterations=1
         )
+        # LRU cache of normalized query -> successful response data
+        self._response_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+
+    def _get_cached_response(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response for a query, if any."""
+        key = query.strip().lower()
+        with self._response_cache_lock:
+            response_data = self._response_cache.get(key)
+            if response_data is not None:
+                self._response_cache.move_to_end(key)
+            return response_data
+
+    def _cache_response(self, query: str, response_data: Dict[str, Any]) -> None:
+        """Store a successful response, evicting the least recently used entry when full."""
+        key = query.strip().lower()
+        with self._response_cache_lock:
+            self._response_cache[key] = response_data
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > _RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
 
     def _clean_text(self, text: str) -> str:
         try:
             # Remove HTML tags
-            text = re.sub(r'<[^>]+>', '', text)
+            text = _HTML_RE.sub('', text)
             
             # Normalize whitespace
-            text = re.sub(r'\s+', ' ', text).strip()
+            text = _WS_RE.sub(' ', text).strip()
             
             # Remove special characters and normalize
-            text = re.sub(r'[^\w\s.,!?-]', '', text)
+            text = _SPECIAL_RE.sub('', text)
             
             return text
         except Exception as e:
             logger.warning(f"Text cleaning error: {e}")
             return text
 
-    def _format_query(self, query: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _format_query(query: str) -> str:
         query = query.lower().strip()
         
         # Common query transformations
-        patterns = [
-            (r'^what\s+is\s+', ''),
-            (r'^who\s+is\s+', ''),
-            (r'^how\s+does\s+', ''),
-            (r'^why\s+', '')
-        ]
-        
-        for pattern, repl in patterns:
-            query = re.sub(pattern, repl, query).strip()
+        for pattern, repl in _QUERY_PATTERNS:
+            query = pattern.sub(repl, query).strip()
         
         # Enhance query with descriptive terms
-        enhance_terms = [
-            "definition", "explanation", "overview", 
-            "key concepts", "main features", "important aspects"
-        ]
-        
-        return f"{query} {' '.join(enhance_terms)}"
+        return f"{query} {_ENHANCE_TERMS}"
 
     def _process_search_results(self, search_results: List[Dict[str, Any]], query: str) -> Dict[str, Any]:
         try:
             compiled_info = []
             sources = []
+            seen_snippets = set()
+            seen_links = set()
             
             for result in search_results:
                 # Only add non-empty, unique snippets
                 snippet = self._clean_text(result.get('snippet', ''))
-                if snippet and snippet not in compiled_info:
+                if snippet and snippet not in seen_snippets:
+                    seen_snippets.add(snippet)
                     compiled_info.append(snippet)
                 
                 # Collect unique sources
                 link = result.get('link', '')
-                if link and link not in sources:
+                if link and link not in seen_links:
+                    seen_links.add(link)
                     sources.append(link)
             
             # Limit sources and info
@@ -151,10 +188,20 @@ Your responses should be informative, clear, and well-organized, focusing on pro
     def _process_step(self, state: AgentState) -> AgentState:
         logger.info(f"{self.name} is researching...")
         messages = state.get('messages', [])
+        timestamp = datetime.now().isoformat()
+
+        # Extract and format query
+        query = messages[-1].content if messages and hasattr(messages[-1], 'content') else "No query provided"
 
         try:
-            # Extract and format query
-            query = messages[-1].content if messages and hasattr(messages[-1], 'content') else "No query provided"
+            # Repeated questions are answered from the cache without searching again
+            cached_response = self._get_cached_response(query)
+            if cached_response is not None:
+                return {
+                    "messages": [AIMessage(content=json_dumps(cached_response))],
+                    "iterations": 1
+                }
+
             formatted_query = self._format_query(query)
 
             # Perform web search
@@ -169,7 +216,7 @@ Your responses should be informative, clear, and well-organized, focusing on pro
             # Handle no results scenario
             if processed_results["status"] == "no_results":
                 return {
-                    "messages": messages + [AIMessage(content=json.dumps(processed_results))],
+                    "messages": [AIMessage(content=json_dumps(processed_results))],
                     "iterations": 1
                 }
 
@@ -196,17 +243,19 @@ Focus on clarity, accuracy, and providing meaningful insights."""
             response_data = {
                 "status": "success",
                 "query": query,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": timestamp,
                 "message": llm_response.content,
-                "sources": processed_results.get("sources", []),
-                "key_points": [
-                    point.strip() for point in llm_response.content.split('\n') 
-                    if point.strip() and not point.strip().startswith('1.') and not point.strip().startswith('2.')
-                ]
+                "sources": processed_results.get("sources", [])
             }
+            if self.include_key_points:
+                response_data["key_points"] = [
+                    point for line in llm_response.content.splitlines()
+                    if (point := line.strip()) and point[:2] not in ('1.', '2.')
+                ]
+            self._cache_response(query, response_data)
 
             return {
-                "messages": messages + [AIMessage(content=json.dumps(response_data))],
+                "messages": [AIMessage(content=json_dumps(response_data))],
                 "iterations": 1
             }
 
@@ -215,7 +264,7 @@ Focus on clarity, accuracy, and providing meaningful insights."""
             error_response = {
                 "status": "error",
                 "query": query,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": timestamp,
                 "error": str(e),
                 "message": "Error occurred during research",
                 "suggestions": [
@@ -225,7 +274,7 @@ Focus on clarity, accuracy, and providing meaningful insights."""
                 ]
             }
             return {
-                "messages": messages + [SystemMessage(content=json.dumps(error_response))],
+                "messages": [SystemMessage(content=json_dumps(error_response))],
                 "iterations": 1
             }
 
@@ -233,7 +282,9 @@ Focus on clarity, accuracy, and providing meaningful insights."""
         """Always end after one iteration."""
         return END
 
+# Shared agent instance, created on first use
+_get_scout = lazy_singleton(ScoutAgent)
+
 def scout(task: str) -> str:
     """Execute research task and return findings."""
-    agent = ScoutAgent()
-    return agent.process(task)
\ No newline at end of file
+    return _get_scout().process(task)
\ No newline at end of file
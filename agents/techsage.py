@@ -1,11 +1,15 @@
 from typing import List, Any, Dict, Literal, Optional
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, AIMessage
 from langgraph.graph import END
-from agents.base import BaseAgent, AgentState
+from agents.base import BaseAgent, AgentState, lazy_singleton, run_sync
 from tools.file.write_to_file import write_to_file
+from tools.file.batch_write import batch_write
 from tools.agent.assign_agent_to_task import assign_agent_to_task
-from tools.file.delete_file import delete_file
+from langchain_openai import OpenAIEmbeddings
+from cache import SemanticCache
+from utils import json_dumps
 import json
+import os
 import re
 import logging
 from datetime import datetime
@@ -14,8 +18,73 @@ from datetime import datetime
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Patterns used to parse LLM output
+_JSON_FENCE_RE = re.compile(r'^```(?:json)?|```$', re.MULTILINE)
+_SQUOTE_FIX_RE = re.compile(r"(?<=\w)'")
+
+# Languages and stacks named in a task; tasks only share a cached analysis
+# semantically when they name the same ones, so "hello world in python" never
+# reuses the analysis (and language) of "hello world in rust". Languages
+# missing from this list are caught by _mentions_language instead.
+_TECH_RE = re.compile(
+    r'(?<![\w+#])(python|javascript|typescript|node(?:\.?js)?|java|kotlin|scala|rust|golang|'
+    r'c\+\+|c#|c|ruby|php|swift|bash|shell|sql|html|css|react|vue|django|flask|fastapi)(?![\w+#])',
+    re.IGNORECASE
+)
+
+def _mentions_language(task: str, analysis: Any) -> bool:
+    """Whether a cached analysis' language is named in the task it would answer."""
+    language = str(analysis.get("language", "")) if isinstance(analysis, dict) else ""
+    return bool(language) and re.search(
+        rf'(?<![\w+#]){re.escape(language)}(?![\w+#])', task, re.IGNORECASE
+    ) is not None
+
+# Documentation sections extracted from the generated implementation
+_SECTION_NAMES = ["Setup Instructions", "Usage Examples", "API Documentation", "Configuration Guide"]
+
+# Static prompt prefixes; the variable task details are sent last in a
+# separate message so the provider can reuse its cached prefix.
+_ANALYSIS_PROMPT = """Analyze the development task provided by the user and provide structured output.
+
+Format response as a valid JSON with these keys:
+- task_type: web/script/config/documentation
+- language: programming language name
+- files_required: list of filenames
+- technologies: relevant technologies
+- implementation_approach: brief strategy
+- primary_features: key features"""
+
+_IMPLEMENTATION_PROMPT = """Comprehensive Code Generation Task
+
+Implement the task described by the user, using the requirements they provide.
+
+Comprehensive Implementation Guidelines:
+1. Create full implementation for each required file
+2. Use modern best practices for the requested language
+3. Include robust error handling
+4. Implement input validation
+5. Add comprehensive type hints
+6. Write clear, explanatory comments
+
+Structural Requirements:
+- Each file must be marked with: ```<language> filename.ext
+- Include complete implementation
+- Add section headers for:
+  a. Setup Instructions
+  b. Usage Examples
+  c. API Documentation (if applicable)
+  d. Configuration Guide
+  e. Error Handling Guide
+
+Provide a production-ready solution that emphasizes:
+- Code quality
+- Maintainability
+- Scalability
+- Performance considerations"""
+
 class TechSageAgent(BaseAgent):
-    def __init__(self, max_iterations: int = 1):
+    def __init__(self, max_iterations: int = 1, persist_files: bool = False):
+        self.persist_files = persist_files
         system_prompt = """You are techsage, a specialized development agent.
 
 Your primary task is to generate well-structured, production-ready code based on user requirements.
@@ -57,36 +126,32 @@ Documentation Guidelines:
             max_iterations=max_iterations
         )
 
+        # Repeated or near-duplicate tasks reuse earlier LLM results.
+        # Implementation prompts are mostly fixed template text, so they are
+        # only matched exactly; embedding similarity would not tell tasks apart.
+        cache_dir = os.getenv('TECHSAGE_CACHE_DIR')
+        self._analysis_cache = SemanticCache(
+            embeddings=OpenAIEmbeddings(model="text-embedding-3-small"),
+            path=os.path.join(cache_dir, 'techsage_analysis.pkl') if cache_dir else None
+        )
+        self._implementation_cache = SemanticCache(
+            path=os.path.join(cache_dir, 'techsage_implementation.pkl') if cache_dir else None
+        )
+
     def _analyze_task(self, task: str) -> Dict[str, Any]:
         """Analyze the task to determine type and requirements with improved error handling."""
-        analysis_prompt = f"""Analyze this development task and provide structured output:
-Task: {task}
-
-Format response as a valid JSON with these keys:
-- task_type: web/script/config/documentation
-- language: programming language name
-- files_required: list of filenames
-- technologies: relevant technologies
-- implementation_approach: brief strategy
-- primary_features: key features"""
+        analysis_messages = [
+            SystemMessage(content=_ANALYSIS_PROMPT),
+            HumanMessage(content=f"Task: {task}")
+        ]
 
         try:
-            response = self.llm.invoke(analysis_prompt)
-            # Enhanced parsing to handle various JSON formats
-            content = response.content.strip()
-            
-            # Remove code block markers if present
-            content = re.sub(r'^```(json)?|```$', '', content, flags=re.MULTILINE).strip()
-            
-            # Attempt to parse JSON with fallback
-            try:
-                analysis = json.loads(content)
-            except json.JSONDecodeError:
-                # Attempt to fix common JSON formatting issues
-                content = re.sub(r'(?<=\w)\'', '"', content)  # Replace single quotes with double quotes
-                analysis = json.loads(content)
-            
-            return analysis
+            return self._analysis_cache.get_or_compute(
+                task,
+                lambda: self._request_analysis(analysis_messages),
+                namespace=" ".join(sorted({match.lower() for match in _TECH_RE.findall(task)})),
+                accept=lambda analysis: _mentions_language(task, analysis)
+            )
         except Exception as e:
             logger.error(f"Task analysis error: {e}")
             return {
@@ -98,53 +163,73 @@ Format response as a valid JSON with these keys:
                 "primary_features": ["core functionality"]
             }
 
-    def _get_implementation_prompt(self, task: str, analysis: Dict[str, Any]) -> str:
-        """Generate a more comprehensive implementation prompt."""
-        return f"""Comprehensive Code Generation Task
+    def _request_analysis(self, analysis_messages: List[BaseMessage]) -> Dict[str, Any]:
+        """Ask the LLM for a task analysis and parse its JSON reply."""
+        response = self.llm.invoke(analysis_messages)
+        # Enhanced parsing to handle various JSON formats
+        content = response.content.strip()
+        
+        # Remove code block markers if present
+        content = _JSON_FENCE_RE.sub('', content).strip()
+        
+        # Attempt to parse JSON with fallback
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            # Attempt to fix common JSON formatting issues
+            content = _SQUOTE_FIX_RE.sub('"', content)  # Replace single quotes with double quotes
+            return json.loads(content)
+
+    def _generate_implementation(self, implementation_prompt: List[BaseMessage]) -> Any:
+        """Generate an implementation, reusing the result for identical prompts."""
+        return self._implementation_cache.get_or_compute(
+            "\n".join(message.content for message in implementation_prompt),
+            lambda: self.llm.invoke(implementation_prompt)
+        )
 
-Detailed Requirements:
+    def _get_implementation_prompt(self, task: str, analysis: Dict[str, Any]) -> List[BaseMessage]:
+        """Generate a more comprehensive implementation prompt."""
+        return [
+            SystemMessage(content=_IMPLEMENTATION_PROMPT),
+            HumanMessage(content=f"""Detailed Requirements:
 - Primary Task: {task}
 - Language: {analysis['language']}
 - Project Type: {analysis['task_type']}
-- Key Features: {', '.join(analysis['primary_features'])}
+- Key Features: {', '.join(analysis['primary_features'])}""")
+        ]
 
-Comprehensive Implementation Guidelines:
-1. Create full implementation for each required file
-2. Use modern {analysis['language']} best practices
-3. Include robust error handling
-4. Implement input validation
-5. Add comprehensive type hints
-6. Write clear, explanatory comments
+    def _extract_code_blocks(self, content: str) -> Dict[str, Dict[str, Any]]:
+        """Extract ```language filename fenced blocks in a single forward scan.
 
-Structural Requirements:
-- Each file must be marked with: ```{analysis['language']} filename.ext
-- Include complete implementation
-- Add section headers for:
-  a. Setup Instructions
-  b. Usage Examples
-  c. API Documentation (if applicable)
-  d. Configuration Guide
-  e. Error Handling Guide
+        Each fence is located with str.find, so the content is walked once
+        without regex backtracking over long code bodies.
+        """
+        code_blocks = {}
+        position = 0
+        while True:
+            start = content.find('```', position)
+            if start == -1:
+                break
+            header_end = content.find('\n', start + 3)
+            if header_end == -1:
+                break
+            end = content.find('```', header_end + 1)
+            if end == -1:
+                break
+            position = end + 3
 
-Provide a production-ready solution that emphasizes:
-- Code quality
-- Maintainability
-- Scalability
-- Performance considerations"""
+            # The header holds the language and filename, e.g. "python main.py"
+            header = content[start + 3:header_end].split()
+            if len(header) >= 2:
+                language, filename = header[0], header[1]
+            elif len(header) == 1 and '.' in header[0]:
+                language, filename = 'text', header[0]
+            else:
+                continue
 
-    def _extract_code_blocks(self, content: str) -> Dict[str, Dict[str, Any]]:
-        """Enhanced code block extraction with robust parsing."""
-        code_blocks = {}
-        code_block_pattern = re.compile(r'```(\w+)?\s*(\S+)\n(.*?)```', re.DOTALL)
-        
-        for match in code_block_pattern.finditer(content):
-            language = match.group(1) or 'text'
-            filename = match.group(2)
-            code = match.group(3).strip()
-            
             code_blocks[filename] = {
                 "language": language,
-                "content": code,
+                "content": content[header_end + 1:end].strip(),
                 "filename": filename
             }
         
@@ -162,23 +247,23 @@ Provide a production-ready solution that emphasizes:
             analysis = self._analyze_task(task)
             
             # Implementation generation
-            implementation = self.llm.invoke(implementation_prompt)
+            implementation_prompt = self._get_implementation_prompt(task, analysis)
+            implementation = self._generate_implementation(implementation_prompt)
             
             # Process code blocks
             code_blocks = self._extract_code_blocks(implementation.content)
             
-            # Write files
-            files_created = []
-            for filename, file_data in code_blocks.items():
-                try:
-                    write_to_file.invoke({
-                        "filepath": filename,
-                        "content": file_data["content"]
-                    })
-                    files_created.append(filename)
-                except Exception as write_error:
-                    logger.error(f"File write error for {filename}: {write_error}")
+            # Generated files are returned in the response; only write them when asked to.
+            # Callers that persist files own their lifecycle.
+            if self.persist_files:
+                files_created = run_sync(batch_write([
+                    (filename, file_data["content"]) for filename, file_data in code_blocks.items()
+                ]))
+            else:
+                files_created = list(code_blocks)
             
+            sections = self._extract_sections(implementation.content, _SECTION_NAMES)
+
             # Comprehensive response generation
             response_data = {
                 "status": "success",
@@ -198,22 +283,16 @@ Provide a production-ready solution that emphasizes:
                         }
                         for file_data in code_blocks.values()
                     ],
-                    "setup": self._extract_section(implementation.content, "Setup Instructions"),
-                    "usage": self._extract_section(implementation.content, "Usage Examples"),
-                    "api_docs": self._extract_section(implementation.content, "API Documentation"),
-                    "configuration": self._extract_section(implementation.content, "Configuration Guide")
+                    "setup": sections["Setup Instructions"],
+                    "usage": sections["Usage Examples"],
+                    "api_docs": sections["API Documentation"],
+                    "configuration": sections["Configuration Guide"]
                 },
                 "files_created": files_created
             }
 
-            for filename in files_created:
-                try:
-                    delete_file.invoke({"filepath": filename})
-                except Exception as delete_error:
-                    logger.error(f"File deletion error for {filename}: {delete_error}")
-
             return {
-                "messages": messages + [AIMessage(content=json.dumps(response_data, indent=2))],
+                "messages": [AIMessage(content=json_dumps(response_data, indent=True))],
                 "iterations": 1
             }
 
@@ -233,46 +312,70 @@ Provide a production-ready solution that emphasizes:
                 ]
             }
             return {
-                "messages": messages + [AIMessage(content=json.dumps(error_response, indent=2))],
+                "messages": [AIMessage(content=json_dumps(error_response, indent=True))],
                 "iterations": 1
             }
 
-    def _extract_section(self, content: str, section_name: str) -> str:
-        """Enhanced section extraction with regex and multiple parsing strategies."""
+    def _extract_sections(self, content: str, section_names: List[str]) -> Dict[str, str]:
+        """Extract several named sections in a single linear pass over the content.
+
+        A section starts at a heading line (ending with ':' or starting with '#',
+        ignoring surrounding bold markers) that contains its name, and runs until
+        the next blank line.
+        """
+        sections: Dict[str, str] = {}
         try:
-            # Regex pattern to find section content
-            section_pattern = re.compile(
-                rf'{section_name}:\n(.*?)(?=\n\n|\Z)', 
-                re.DOTALL | re.IGNORECASE
-            )
-            match = section_pattern.search(content)
-            
-            if match:
-                return match.group(1).strip()
-            
-            # Fallback parsing strategy
-            if section_name in content:
-                parts = content.split(section_name)
-                if len(parts) > 1:
-                    section = parts[1].split('\n\n')[0].strip()
-                    return section
+            targets = {name.lower(): name for name in section_names}
+            current = None
+            captured: List[str] = []
+
+            for line in content.split('\n'):
+                if current is not None:
+                    if line.strip():
+                        captured.append(line)
+                        continue
+                    if not captured:
+                        # Skip blank lines between the heading and its body
+                        continue
+                    sections[current] = '\n'.join(captured).strip()
+                    current = None
+                    if len(sections) == len(targets):
+                        break
+                    continue
+
+                # Ignore bold markers, e.g. "**Setup Instructions:**"
+                heading = line.strip().strip('*').strip()
+                if heading.endswith(':') or heading.startswith('#'):
+                    # Exact headings like "## Usage Examples" resolve with one lookup;
+                    # decorated ones like "c. API Documentation (if applicable):" fall back to a scan
+                    lowered = heading.lower()
+                    name = targets.get(lowered.strip('#*: '))
+                    if name is None:
+                        name = next((name for target, name in targets.items() if target in lowered), None)
+                    current = name if name not in sections else None
+                    captured = []
+
+            if current is not None:
+                sections[current] = '\n'.join(captured).strip()
         except Exception as e:
-            logger.warning(f"Section extraction error for {section_name}: {e}")
-        
-        return ""
+            logger.warning(f"Section extraction error: {e}")
+
+        return {name: sections.get(name, "") for name in section_names}
 
     def _should_continue(self, state: AgentState) -> Literal["continue", END]:
         """Always terminate after one iteration."""
         return END
 
+# Shared agent instance, created on first use
+_get_techsage = lazy_singleton(TechSageAgent)
+
 def techsage(task: str) -> str:
     """Execute development task and return comprehensive results."""
     try:
-        agent = TechSageAgent()
-        return agent.process(task)
+        return _get_techsage().process(task)
     except Exception as e:
         logger.error(f"Tech Sage agent execution failed: {e}")
-        return json.dumps({
+        return json_dumps({
             "status": "critical_error",
             "message": "Failed to execute engineering task",
             "error": str(e),
@@ -1,6 +1,6 @@
 from typing import List, Any
 from langchain_core.messages import SystemMessage, HumanMessage
-from agents.base import BaseAgent, AgentState
+from agents.base import BaseAgent, AgentState, lazy_singleton
 from tools.file.write_to_file import write_to_file
 from tools.file.read_file import read_file
 from tools.file.delete_file import delete_file
@@ -29,7 +29,9 @@ class ToolSmithAgent(BaseAgent):
 
         super().__init__("tool_smith", system_prompt, tools)
 
+# Shared agent instance, created on first use
+_get_tool_smith = lazy_singleton(ToolSmithAgent)
+
 def tool_smith(task: str) -> str:
     """Creates new agents for specific purposes."""
-    agent = ToolSmithAgent()
-    return agent.process(task)
\ No newline at end of file
+    return _get_tool_smith().process(task)
\ No newline at end of file
@@ -2,14 +2,19 @@
 import os
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 import uuid
-from typing import Dict, Optional
+from typing import Iterator, Optional
 import gc
 import psutil
+import threading
+import time
+from cachetools import TTLCache
 
-from agents.compass import compass
+from agents.compass import compass, compass_events
+from utils import json_dumps
 
 app = FastAPI()
 
@@ -22,17 +27,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Memory guard: RSS is sampled every MEMORY_CHECK_INTERVAL requests (and on
+# every request once it nears the limit); gc runs only above GC_THRESHOLD_MB,
+# and at most once every GC_MIN_INTERVAL_SECONDS.
+MEMORY_CHECK_INTERVAL = 10
+GC_THRESHOLD_MB = 800
+GC_MIN_INTERVAL_SECONDS = 30
+MEMORY_LIMIT_MB = 900
+
+_process = psutil.Process(os.getpid())
+_request_count = 0
+_rss_mb = 0
+_last_gc = float('-inf')
+
+def _current_rss_mb() -> int:
+    return _process.memory_info().rss >> 20
+
 @app.middleware("http")
 async def check_memory_usage(request, call_next):
-    # Force garbage collection before processing request
-    gc.collect()
-    
-    # Get current memory usage
-    process = psutil.Process(os.getpid())
-    mem_before = process.memory_info().rss / 1024 / 1024  # Memory in MB
-    
+    global _request_count, _rss_mb, _last_gc
+    _request_count += 1
+
+    if _request_count % MEMORY_CHECK_INTERVAL == 1 or _rss_mb > GC_THRESHOLD_MB:
+        _rss_mb = _current_rss_mb()
+        # Only pay for a full collection when memory is actually high, and
+        # not again while a recent one failed to bring it down
+        now = time.monotonic()
+        if _rss_mb > GC_THRESHOLD_MB and now - _last_gc >= GC_MIN_INTERVAL_SECONDS:
+            _last_gc = now
+            gc.collect()
+            _rss_mb = _current_rss_mb()
+
     # If memory usage is too high, refuse new requests
-    if mem_before > 900:  # 900MB threshold
+    if _rss_mb > MEMORY_LIMIT_MB:
         raise HTTPException(
             status_code=503,
             detail="Server is currently overloaded. Please try again later."
@@ -49,34 +76,47 @@ class ChatResponse(BaseModel):
     response: str
     session_id: str
 
-# Store active sessions
-active_sessions: Dict[str, dict] = {}
+# Store active sessions; idle sessions expire after an hour
+MAX_SESSIONS = 10_000
+SESSION_TTL_SECONDS = 3600
+MAX_HISTORY_MESSAGES = 40
+
+active_sessions: TTLCache = TTLCache(maxsize=MAX_SESSIONS, ttl=SESSION_TTL_SECONDS)
+
+# Streamed responses update sessions from a worker thread
+_sessions_lock = threading.Lock()
+
+def _record_turn(session_id: str, message: str, response: str) -> None:
+    """Append a user/assistant exchange, keeping only the most recent messages."""
+    with _sessions_lock:
+        session = active_sessions.get(session_id) or {"history": []}
+        history = session["history"]
+        history.append({
+            "role": "user",
+            "content": message
+        })
+        history.append({
+            "role": "assistant",
+            "content": response
+        })
+        del history[:-MAX_HISTORY_MESSAGES]
+        # Reassigning refreshes the session's TTL
+        active_sessions[session_id] = session
 
+# A plain def, so FastAPI runs the blocking Compass call in its threadpool
+# instead of stalling the event loop
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
+def chat_endpoint(request: ChatRequest):
     try:
         # Generate session_id if not provided
         session_id = request.session_id or str(uuid.uuid4())
         
-        # Initialize session if it doesn't exist
-        if session_id not in active_sessions:
-            active_sessions[session_id] = {
-                "history": []
-            }
-        
         # Process message through Compass agent
         response = compass(session_id, request.message)
         # print(response)
         
         # Update session history
-        active_sessions[session_id]["history"].append({
-            "role": "user",
-            "content": request.message
-        })
-        active_sessions[session_id]["history"].append({
-            "role": "assistant",
-            "content": response
-        })
+        _record_turn(session_id, request.message, response)
         
         return ChatResponse(
             response=response,
@@ -86,6 +126,33 @@ async def chat_endpoint(request: ChatRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _stream_chat(session_id: str, message: str) -> Iterator[str]:
+    """Yield NDJSON lines carrying text as Compass produces it.
+
+    Delta lines are progress only; the last line carries the same response
+    /api/chat returns, plus "done": true. Only Compass's own model output is
+    streamed: when a task is delegated, the agents' answers arrive in the
+    last line alone.
+    """
+    for kind, text in compass_events(session_id, message):
+        if kind == "delta":
+            yield json_dumps({"session_id": session_id, "delta": text}) + "\n"
+            continue
+
+        _record_turn(session_id, message, text)
+        yield json_dumps({"session_id": session_id, "response": text, "done": True}) + "\n"
+
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    # Generate session_id if not provided
+    session_id = request.session_id or str(uuid.uuid4())
+
+    # The generator is synchronous, so Starlette iterates it in a worker thread
+    return StreamingResponse(
+        _stream_chat(session_id, request.message),
+        media_type="application/x-ndjson"
+    )
+
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy"}
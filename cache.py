@@ -0,0 +1,205 @@
+import atexit
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class SemanticCache:
+    """Two-tier cache for LLM results keyed by request text.
+
+    Exact matches are found by hashing the normalized text. When an embeddings
+    model is provided, misses fall back to the most similar cached entry whose
+    cosine similarity reaches ``threshold``. Semantic matches are only made
+    between entries with the same ``namespace``, so callers can keep requests
+    that must not share results apart even when their wording is close, and
+    only served if ``accept`` (when given) approves the cached value.
+
+    If ``path`` is set, the cache is loaded from that file and saved back in
+    the background at most every ``save_interval`` seconds, and at exit.
+    """
+
+    def __init__(
+        self,
+        embeddings: Any = None,
+        threshold: float = 0.92,
+        max_entries: int = 1024,
+        path: Optional[str] = None,
+        save_interval: float = 60.0
+    ):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.path = path
+        self.save_interval = save_interval
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        # Row i of the matrix holds the normalized embedding for _row_keys[i]
+        self._row_keys: List[str] = []
+        self._row_namespaces: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        # Serializes writers; never held together with _lock during pickling
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._load()
+        if self.path:
+            atexit.register(self.save)
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.blake2b(text.strip().lower().encode('utf-8')).hexdigest()
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Embed and L2-normalize text, or return None if embedding fails."""
+        try:
+            vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+        except Exception as e:
+            logger.warning("Embedding error, skipping semantic lookup: %s", e)
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _check_dimension(self, vector: np.ndarray) -> None:
+        """Drop the semantic index if it was built by a model with another
+        embedding size; exact entries are kept. Call with _lock held."""
+        if self._matrix is not None and self._matrix.shape[1] != vector.shape[0]:
+            logger.warning(
+                "Cached embeddings have dimension %d, expected %d; discarding them",
+                self._matrix.shape[1], vector.shape[0]
+            )
+            self._matrix = None
+            self._row_keys = []
+            self._row_namespaces = []
+            self._dirty = True
+
+    def _lookup(
+        self,
+        key: str,
+        vector: Optional[np.ndarray],
+        namespace: str,
+        accept: Optional[Callable[[Any], bool]]
+    ) -> Optional[Any]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+            if vector is None:
+                return None
+            self._check_dimension(vector)
+            if self._matrix is None or not self._row_keys:
+                return None
+            scores = self._matrix @ vector
+            # Rows from other namespaces can never match
+            scores[np.asarray(self._row_namespaces) != namespace] = -1.0
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            row_key = self._row_keys[best]
+            if accept is not None and not accept(self._entries[row_key]):
+                return None
+            self._entries.move_to_end(row_key)
+            return self._entries[row_key]
+
+    def _store(self, key: str, value: Any, vector: Optional[np.ndarray], namespace: str) -> None:
+        with self._lock:
+            if key not in self._entries and vector is not None:
+                self._check_dimension(vector)
+                row = vector[np.newaxis, :]
+                self._matrix = row if self._matrix is None else np.vstack([self._matrix, row])
+                self._row_keys.append(key)
+                self._row_namespaces.append(namespace)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                if evicted in self._row_keys:
+                    index = self._row_keys.index(evicted)
+                    del self._row_keys[index]
+                    del self._row_namespaces[index]
+                    self._matrix = np.delete(self._matrix, index, axis=0)
+            self._dirty = True
+
+        if self.path and time.monotonic() - self._last_save >= self.save_interval:
+            self._last_save = time.monotonic()
+            threading.Thread(target=self.save, daemon=True).start()
+
+    def get_or_compute(
+        self,
+        text: str,
+        compute: Callable[[], Any],
+        namespace: str = "",
+        accept: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """Return the cached value for text, or compute and cache it.
+
+        accept, if given, is called with a semantically matched value and must
+        return True for it to be used. Exceptions raised by compute propagate
+        and nothing is cached.
+        """
+        key = self._key(text)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        vector = self._embed(text) if self.embeddings is not None else None
+        cached = self._lookup(key, vector, namespace, accept)
+        if cached is not None:
+            return cached
+
+        value = compute()
+        self._store(key, value, vector, namespace)
+        return value
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+            self._entries = data['entries']
+            self._row_keys = data['row_keys']
+            self._row_namespaces = data.get('row_namespaces', [""] * len(self._row_keys))
+            self._matrix = data['matrix']
+        except Exception as e:
+            logger.warning("Could not load cache from %s: %s", self.path, e)
+
+    def save(self) -> None:
+        """Write the cache to disk if it changed since the last save.
+
+        Only a shallow snapshot is taken under the lookup lock; pickling and
+        the file write happen outside it.
+        """
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                # The matrix is replaced, never mutated in place, so sharing it is safe
+                snapshot = {
+                    'entries': OrderedDict(self._entries),
+                    'row_keys': list(self._row_keys),
+                    'row_namespaces': list(self._row_namespaces),
+                    'matrix': self._matrix
+                }
+                self._dirty = False
+            try:
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(snapshot, f)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.warning("Could not save cache to %s: %s", self.path, e)
+                with self._lock:
+                    self._dirty = True
@@ -1,3 +1,4 @@
+import logging
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -17,11 +18,13 @@ if not OPENAI_API_KEY:
     raise ValueError("OPENAI_API_KEY must be set in .env file")
 SERPER_API_KEY = os.getenv('SERPER_API_KEY')
 if not SERPER_API_KEY:
+    logging.warning("SERPER_API_KEY is not set; web search will fall back to DuckDuckGo")
 
 # Configure default language model
 default_langchain_model = ChatOpenAI(
     model="gpt-4-turbo-preview",
-    temperature=0
+    temperature=0,
+    model_kwargs={"prompt_cache_key": "almaze-default-v1"}
 )
 
 # Logging configuration
@@ -0,0 +1,93 @@
+import importlib
+import json
+import os
+
+import pytest
+from langchain_core.messages import AIMessage
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+techsage_module = importlib.import_module("agents.techsage")
+
+ANALYSIS = {
+    "task_type": "script",
+    "language": "python",
+    "files_required": ["main.py"],
+    "technologies": ["python"],
+    "implementation_approach": "Single script",
+    "primary_features": ["print a greeting"]
+}
+
+IMPLEMENTATION = """```python main.py
+print("Hello, world!")
+```
+
+Setup Instructions:
+Install Python 3.
+
+Usage Examples:
+python main.py
+"""
+
+class FakeLLM:
+    """Returns a canned analysis or implementation depending on the prompt."""
+
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, messages, **kwargs):
+        self.calls.append(messages)
+        if messages[0].content == techsage_module._ANALYSIS_PROMPT:
+            return AIMessage(content=json.dumps(ANALYSIS))
+        return AIMessage(content=IMPLEMENTATION)
+
+@pytest.fixture
+def agent(monkeypatch):
+    agent = techsage_module.TechSageAgent()
+    agent.llm = FakeLLM()
+    # Keep the analysis cache to its exact tier so no embeddings are requested
+    agent._analysis_cache.embeddings = None
+    monkeypatch.setattr(techsage_module, "_get_techsage", lambda: agent)
+    return agent
+
+def test_hello_world_succeeds(agent):
+    result = json.loads(techsage_module.techsage("write a hello world in python"))
+
+    assert result["status"] == "success"
+    assert result["analysis"]["language"] == "python"
+    assert result["implementation"]["files"] == [{
+        "filename": "main.py",
+        "language": "python",
+        "content": 'print("Hello, world!")'
+    }]
+    assert result["implementation"]["setup"] == "Install Python 3."
+    assert result["implementation"]["usage"] == "python main.py"
+    assert result["files_created"] == ["main.py"]
+
+def test_implementation_prompt_includes_analysis(agent):
+    techsage_module.techsage("write a hello world in python")
+
+    implementation_prompt = agent.llm.calls[-1]
+    assert implementation_prompt[0].content == techsage_module._IMPLEMENTATION_PROMPT
+    assert "Primary Task: write a hello world in python" in implementation_prompt[1].content
+    assert "Language: python" in implementation_prompt[1].content
+
+class SameEmbeddings:
+    """Embeds every text to the same vector, so any two tasks look alike."""
+
+    def embed_query(self, text):
+        return [1.0, 0.0, 0.0]
+
+def test_similar_task_in_other_language_is_analyzed_again(agent):
+    agent._analysis_cache.embeddings = SameEmbeddings()
+
+    # Neither task names a language from _TECH_RE, so they share a namespace;
+    # the cached analysis (language python) does not fit the elixir task
+    agent._analyze_task("write a hello world in haskell")
+    agent._analyze_task("write a hello world in elixir")
+
+    analysis_calls = [
+        messages for messages in agent.llm.calls
+        if messages[0].content == techsage_module._ANALYSIS_PROMPT
+    ]
+    assert len(analysis_calls) == 2
@@ -1,20 +1,28 @@
-from typing import Dict
+from typing import Callable, Dict
+import importlib
 from langchain_core.tools import tool
 
+# Agent entry points by name, resolved on first dispatch
+_AGENT_FUNC_CACHE: Dict[str, Callable[..., str]] = {}
+
 @tool
 def assign_agent_to_task(agent_name: str, task: str) -> str:
     """Assigns a task to a specific agent."""
-        # Import agent module
-        agent_module = __import__(f"agents.{agent_name}", fromlist=[agent_name])
-        
-        # Get agent function
-        agent_func = getattr(agent_module, agent_name)
+    try:
+        # Import agent module and get agent function
+        agent_func = _AGENT_FUNC_CACHE.get(agent_name)
+        if agent_func is None:
+            agent_module = importlib.import_module(f"agents.{agent_name}")
+            agent_func = getattr(agent_module, agent_name)
+            _AGENT_FUNC_CACHE[agent_name] = agent_func
         
         # Execute task with session ID (if required)
+        if agent_name == 'compass':
             return agent_func('internal_session', task)
         else:
             return agent_func(task)
     except ImportError:
+        return f"Error: Agent '{agent_name}' not found"
     except AttributeError:
         return f"Error: Agent function '{agent_name}' not found in module"
     except Exception as e:
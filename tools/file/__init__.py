@@ -1,5 +1,7 @@
 from .write_to_file import write_to_file
 from .delete_file import delete_file
 
+__all__ = [
     'write_to_file',
     'delete_file',
+]
\ No newline at end of file
@@ -0,0 +1,28 @@
+import asyncio
+import logging
+from typing import List, Tuple
+
+from tools.file.write_to_file import write_file
+from utils import WORKER_POOL, submit_to_pool
+
+logger = logging.getLogger(__name__)
+
+async def batch_write(files: List[Tuple[str, str]]) -> List[str]:
+    """Write several files concurrently and return the paths written successfully.
+
+    Each write runs on the shared worker pool, so the batch takes roughly as
+    long as the slowest file. Failures are logged and left out of the result.
+    """
+    results = await asyncio.gather(
+        *(asyncio.wrap_future(submit_to_pool(WORKER_POOL, write_file, filepath, content))
+          for filepath, content in files),
+        return_exceptions=True
+    )
+
+    written = []
+    for (filepath, _), result in zip(files, results):
+        if isinstance(result, Exception):
+            logger.error("File write error for %s: %s", filepath, result)
+        else:
+            written.append(filepath)
+    return written
\ No newline at end of file
@@ -1,12 +1,13 @@
+import os
 from langchain_core.tools import tool
 
 @tool
 def delete_file(filepath: str) -> str:
     """Delete a file."""
     try:
-        path = Path(filepath)
-            return f"Error: File {filepath} does not exist"
-            
-        path.unlink()
+        os.unlink(filepath)
         return f"Successfully deleted {filepath}"
+    except FileNotFoundError:
+        return f"Error: File {filepath} does not exist"
+    except Exception as e:
         return f"Error deleting file: {str(e)}"
\ No newline at end of file
@@ -1,12 +1,15 @@
+from langchain_core.tools import tool
 
 @tool
 def overwrite_file(filepath: str, content: str) -> str:
     """Overwrite content in an existing file."""
     try:
-        if not path.exists():
-            return f"Error: File {filepath} does not exist"
-            
-        with open(filepath, 'w', encoding='utf-8') as f:
+        # r+ fails if the file is missing, so no separate existence check is needed
+        with open(filepath, 'r+', encoding='utf-8') as f:
             f.write(content)
+            f.truncate()
         return f"Successfully overwrote {filepath}"
+    except FileNotFoundError:
+        return f"Error: File {filepath} does not exist"
     except Exception as e:
+        return f"Error overwriting file: {str(e)}"
\ No newline at end of file
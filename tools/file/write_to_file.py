@@ -1,14 +1,20 @@
-import os
 from pathlib import Path
 from langchain_core.tools import tool
+
+def write_file(filepath: str, content: str) -> None:
+    """Write content to a file, creating parent directories as needed."""
+    parent = Path(filepath).parent
+    if parent != Path('.'):
+        parent.mkdir(parents=True, exist_ok=True)
+    
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(content)
+
 @tool
 def write_to_file(filepath: str, content: str) -> str:
     """Write content to a file, creating directories if they don't exist."""
-        path = Path(filepath)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
+    try:
+        write_file(filepath, content)
         return f"Successfully wrote content to {filepath}"
+    except Exception as e:
         return f"Error writing to file: {str(e)}"
\ No newline at end of file
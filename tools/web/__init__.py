@@ -1,5 +1,7 @@
 from .duck_duck_go_web_search import duck_duck_go_web_search
 from .fetch_web_page_content import fetch_web_page_content
 
+__all__ = [
     'duck_duck_go_web_search',
     'fetch_web_page_content'
+]
\ No newline at end of file
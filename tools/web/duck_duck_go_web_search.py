@@ -1,15 +1,22 @@
 import os
 from typing import List, Dict, Optional, Union
 from langchain_core.tools import tool
-import http.client
-import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
 from urllib.parse import quote_plus
+from tools.web.http_session import SESSION
+from utils import json_loads
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Workers for racing the search backends against each other
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="web-search")
+
+# Seconds to wait for Serper before also querying DuckDuckGo
+_HEDGE_DELAY = 2.0
+
 class WebSearchTool:
     
     def __init__(self, max_results: int = 5):
@@ -22,15 +29,13 @@ class WebSearchTool:
 
     def search_duckduckgo(self, query: str) -> List[Dict[str, str]]:
         try:
-            import requests
-            
             encoded_query = quote_plus(query)
             url = f"https://api.duckduckgo.com/?q={encoded_query}&format=json"
             
-            response = requests.get(url, timeout=10)
+            response = SESSION.get(url, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
+            data = json_loads(response.content)
             results = []
             
             # Add abstract if available
@@ -61,45 +66,48 @@ class WebSearchTool:
             return []
         
         try:
-            conn = http.client.HTTPSConnection("google.serper.dev")
-            payload = json.dumps({
+            payload = {
                 "q": query,
                 "num": self.max_results
-            })
+            }
             headers = {
-                'X-API-KEY': self.serper_api_key,
-                'Content-Type': 'application/json'
+                'X-API-KEY': self.serper_api_key
             }
             
-            conn.request("POST", "/search", payload, headers)
-            res = conn.getresponse()
-            data = res.read().decode("utf-8")
+            response = SESSION.post("https://google.serper.dev/search", json=payload, headers=headers, timeout=10)
+            response.raise_for_status()
             
             # Parse the JSON response
-            search_results = json.loads(data)
+            search_results = json_loads(response.content)
             
-            results = []
-            for result in search_results.get('organic', []):
-                results.append({
+            return [
+                {
                     'title': result.get('title', ''),
                     'link': result.get('link', ''),
                     'snippet': self._clean_text(result.get('snippet', ''))
-                })
-            
-            return results
+                }
+                for result in search_results.get('organic', [])
+            ]
         except Exception as e:
             logger.error(f"Serper search error: {e}")
             return []
 
     def search(self, query: str) -> List[Dict[str, str]]:
 
-        search_methods = [
-            self.search_serper,  # Changed order to try Serper first
-            self.search_duckduckgo,
-        ]
+        # Serper is preferred; DuckDuckGo is only started as a hedge if Serper
+        # comes back empty or has not answered within the hedge delay
+        serper = _SEARCH_POOL.submit(self.search_serper, query)
+        try:
+            results = serper.result(timeout=_HEDGE_DELAY)
+            if results:
+                return results
+            pending = []
+        except TimeoutError:
+            pending = [serper]
         
-        for method in search_methods:
-            results = method(query)
+        pending.append(_SEARCH_POOL.submit(self.search_duckduckgo, query))
+        for future in as_completed(pending):
+            results = future.result()
             if results:
                 return results
         
@@ -1,6 +1,6 @@
-import requests
 from bs4 import BeautifulSoup
 from langchain_core.tools import tool
+from tools.web.http_session import SESSION
 
 @tool
 def fetch_web_page_content(url: str) -> str:
@@ -11,10 +11,10 @@ def fetch_web_page_content(url: str) -> str:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = SESSION.get(url, headers=headers, timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml')
         # Remove unwanted elements
         for element in soup(['script', 'style', 'header', 'footer', 'nav']):
             element.decompose()
@@ -0,0 +1,14 @@
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Pooled HTTP session shared by the web tools, so repeat requests to the same
+# host reuse keep-alive connections instead of paying a new TCP+TLS handshake
+SESSION = requests.Session()
+# The session is shared across users and threads, so it must not keep cookies
+# set by one request and send them with another
+SESSION.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64)
+SESSION.mount('https://', _adapter)
+SESSION.mount('http://', _adapter)
\ No newline at end of file
@@ -1,10 +1,21 @@
 import os
+import contextvars
+import functools
 import importlib
 import inspect
+import json
 import logging
-from typing import List, Optional, Dict, Any
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Dict, Any, Tuple
 from pathlib import Path
 
+from langchain_core.tools import BaseTool
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -12,6 +23,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Bounded worker pools shared by agents and tools. Running another agent
+# (delegation) uses its own pool, so an agent blocked on a delegated task never
+# holds a worker that leaf I/O such as searches and file writes is waiting for.
+WORKER_POOL = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("ALMAZE_POOL", 32)),
+    thread_name_prefix="almaze"
+)
+DELEGATION_POOL = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("ALMAZE_DELEGATION_POOL", 16)),
+    thread_name_prefix="almaze-delegate"
+)
+
+def submit_to_pool(pool: ThreadPoolExecutor, fn: Callable[..., Any], *args: Any) -> Future:
+    """Run a blocking call on a pool, carrying over the caller's context."""
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+def run_concurrently(calls: List[Tuple[Any, ...]]) -> List[Any]:
+    """Run (pool, fn, *args) calls in parallel and return their results in order.
+
+    Calls still queued when the caller gets to them are taken back and run in
+    the caller's thread, so a worker that waits on calls from its own pool
+    never blocks on work that has no free worker to run it.
+    """
+    futures = [submit_to_pool(pool, fn, *args) for pool, fn, *args in calls]
+    results = []
+    for (pool, fn, *args), future in zip(calls, futures):
+        if future.cancel():
+            results.append(contextvars.copy_context().run(fn, *args))
+        else:
+            results.append(future.result())
+    return results
+
 def setup_logging(log_level: str = 'INFO') -> None:
     """Configure logging for the application."""
     numeric_level = getattr(logging, log_level.upper(), None)
@@ -19,50 +62,76 @@ def setup_logging(log_level: str = 'INFO') -> None:
         raise ValueError(f'Invalid log level: {log_level}')
     logging.getLogger().setLevel(numeric_level)
 
+def json_dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize an object to a JSON string, using orjson when available.
+
+    With indent=True the output is pretty-printed with two-space indentation.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None).decode('utf-8')
+    return json.dumps(obj, indent=2 if indent else None)
+
+def json_loads(data: str | bytes) -> Any:
+    """Parse a JSON document, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 def get_project_root() -> Path:
     """Get the project root directory."""
     return Path(__file__).parent
 
-def load_module_functions(directory: str, module_type: str) -> List[Any]:
-    """Load all functions from modules in a directory."""
+def load_module_functions(directory: str) -> List[BaseTool]:
+    """Load all tools from modules in a directory."""
     functions = []
     dir_path = get_project_root() / directory
+
+    def collect(module_name: str) -> None:
+        module = importlib.import_module(module_name)
+        for name, obj in inspect.getmembers(module):
+            # Tools imported by several modules are only collected once
+            if isinstance(obj, BaseTool) and obj not in functions:
+                functions.append(obj)
     
-    for item in os.listdir(dir_path):
-        if os.path.isdir(dir_path / item) and not item.startswith('__'):
-            # Handle subdirectories
-            for file in os.listdir(dir_path / item):
-                if file.endswith('.py') and not file.startswith('__'):
-                    module_name = f"{directory}.{item}.{file[:-3]}"
-                    for name, obj in inspect.getmembers(module):
-                        if inspect.isfunction(obj) and hasattr(obj, f"_{module_type}"):
-                            functions.append(obj)
-        elif item.endswith('.py') and not item.startswith('__'):
-            # Handle files in the root of the directory
-            module_name = f"{directory}.{item[:-3]}"
-            module = importlib.import_module(module_name)
-            for name, obj in inspect.getmembers(module):
-                if inspect.isfunction(obj) and hasattr(obj, f"_{module_type}"):
-                    functions.append(obj)
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.name.startswith('__'):
+                continue
+            if entry.is_dir():
+                # Handle subdirectories
+                with os.scandir(entry.path) as files:
+                    for file in files:
+                        if file.name.endswith('.py') and not file.name.startswith('__'):
+                            collect(f"{directory}.{entry.name}.{file.name[:-3]}")
+            elif entry.name.endswith('.py'):
+                # Handle files in the root of the directory
+                collect(f"{directory}.{entry.name[:-3]}")
     return functions
 
+# Tool modules import utils themselves, so the scans below run on first use
+# rather than at import time; both are memoized for the life of the process.
+@functools.lru_cache(maxsize=None)
+def _scan_tools() -> Tuple[Any, ...]:
+    return tuple(load_module_functions('tools'))
+
+# Modules in agents/ that do not define an agent
+_NOT_AGENTS = frozenset({'__init__.py', 'base.py'})
+
+@functools.lru_cache(maxsize=None)
+def _scan_agents() -> Tuple[str, ...]:
+    with os.scandir(get_project_root() / 'agents') as entries:
+        return tuple(
+            entry.name[:-3] for entry in entries
+            if entry.name.endswith('.py') and entry.name not in _NOT_AGENTS
+        )
+
 def all_tool_functions(exclude: Optional[List[str]] = None) -> List[Any]:
     """Get all available tool functions."""
-    return load_module_functions('tools', 'tool')
+    return [tool for tool in _scan_tools() if not exclude or tool.name not in exclude]
 
 def all_agents(exclude: Optional[List[str]] = None) -> List[str]:
     """Get all available agents."""
-    agents = []
-    agents_dir = get_project_root() / 'agents'
-    
-    for file in os.listdir(agents_dir):
-        if file.endswith('.py') and not file.startswith('__'):
-            agent_name = file[:-3]
-            if exclude and agent_name in exclude:
-                continue
-            agents.append(agent_name)
-    
-    return agents
+    return [agent for agent in _scan_agents() if not exclude or agent not in exclude]
 
 def checkpointer(state: Dict[str, Any]) -> Dict[str, Any]:
     logger.debug(f"Current state: {state}")